@@ -28,21 +28,11 @@ from enterprise_data.filters import (
 )
 from enterprise_data.models import EnterpriseEnrollment, EnterpriseUser
 from enterprise_data.paginators import EnterpriseEnrollmentsPagination
+from enterprise_data.utils import subtract_one_month, subtract_one_week
 
 LOGGER = getLogger(__name__)
 
 
-def subtract_one_month(original_date):
-    """
-    Returns a date exactly one month prior to the passed in date.
-    """
-    one_day = timedelta(days=1)
-    one_month_earlier = original_date - one_day
-    while one_month_earlier.month == original_date.month or one_month_earlier.day > original_date.day:
-        one_month_earlier -= one_day
-    return one_month_earlier
-
-
 class EnterpriseViewSetMixin(PermissionRequiredMixin):
     """
     Base class for all Enterprise view sets.
@@ -86,7 +76,7 @@ class EnterpriseEnrollmentsViewSet(EnterpriseViewSetMixin, viewsets.ReadOnlyMode
 
         enterprise_id = self.kwargs['enterprise_id']
 
-        enterprise = EnterpriseUser.objects.filter(enterprise_id=enterprise_id)
+        enterprise = EnterpriseUser.objects.filter(enterprise_id=enterprise_id).exists()
         if not enterprise:
             LOGGER.warning(
                 "[Data Overview Failure] No enterprise found with id %s from endpoint '%s'. User: %s, Enterprise: %s",
@@ -104,7 +94,7 @@ class EnterpriseEnrollmentsViewSet(EnterpriseViewSetMixin, viewsets.ReadOnlyMode
         """
         query_filters = self.request.query_params
 
-        past_week_date = date.today() - timedelta(weeks=1)
+        past_week_date = subtract_one_week(date.today())
         past_month_date = subtract_one_month(date.today())
 
         passed_date_param = query_filters.get('passed_date')
@@ -213,7 +203,7 @@ class EnterpriseEnrollmentsViewSet(EnterpriseViewSetMixin, viewsets.ReadOnlyMode
         enrollments = self.filter_queryset(enrollments)
         course_completions = self.filter_course_completions(enrollments)
         distinct_learners = self.filter_distinct_learners(enrollments)
-        past_week_date = date.today() - timedelta(weeks=1)
+        past_week_date = subtract_one_week(date.today())
         past_month_date = subtract_one_month(date.today())
         active_learners_week = self.filter_distinct_active_learners(enrollments, past_week_date)
         last_updated_date = self.get_max_created_date(enrollments)
@@ -279,7 +269,7 @@ class EnterpriseUsersViewSet(EnterpriseViewSetMixin, viewsets.ReadOnlyModelViewS
                     consent_granted=True,
                 )
                 .values('enterprise_user')
-                .annotate(enrollment_count=Count('pk', distinct=True))
+                .annotate(enrollment_count=Count('pk'))
                 .values('enrollment_count')
             )
             queryset = queryset.annotate(
@@ -298,7 +288,7 @@ class EnterpriseUsersViewSet(EnterpriseViewSetMixin, viewsets.ReadOnlyModelViewS
                     consent_granted=True,
                 )
                 .values('enterprise_user')
-                .annotate(course_completion_count=Count('pk', distinct=True))
+                .annotate(course_completion_count=Count('pk'))
                 .values('course_completion_count')
             )
             # Coalesce and Value used here so we don't return "null" to the
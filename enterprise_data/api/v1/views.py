@@ -2,9 +2,11 @@
 Views for enterprise api v1.
 """
 
-from datetime import date, timedelta
+import csv
+import re
+from datetime import date
 from logging import getLogger
-from uuid import UUID
+from urllib.parse import urlencode
 
 from django_filters.rest_framework import DjangoFilterBackend
 from edx_django_utils.cache import TieredCache
@@ -18,9 +20,10 @@ from rest_framework.response import Response
 from rest_framework.status import HTTP_200_OK, HTTP_404_NOT_FOUND
 from rest_framework.views import APIView
 
-from django.db.models import Count, Max, OuterRef, Prefetch, Q, Subquery, Value
+from django.db.models import Case, Count, Exists, Max, OuterRef, Q, Subquery, Sum, Value, When
 from django.db.models.fields import IntegerField
 from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 
 from enterprise_data.api.v1 import serializers
@@ -34,21 +37,12 @@ from enterprise_data.models import (
     EnterpriseOffer,
 )
 from enterprise_data.paginators import EnterpriseEnrollmentsPagination
-from enterprise_data.utils import get_cache_key
+from enterprise_data.utils import Echo, get_cache_key, subtract_one_month, subtract_one_week
 
 LOGGER = getLogger(__name__)
 DEFAULT_LEARNER_CACHE_TIMEOUT = 60 * 10
-
-
-def subtract_one_month(original_date):
-    """
-    Returns a date exactly one month prior to the passed in date.
-    """
-    one_day = timedelta(days=1)
-    one_month_earlier = original_date - one_day
-    while one_month_earlier.month == original_date.month or one_month_earlier.day > original_date.day:
-        one_month_earlier -= one_day
-    return one_month_earlier
+CSV_EXPORT_CHUNK_SIZE = 2000
+HEX_REGEX = re.compile('[0-9a-fA-F]+')
 
 
 class EnterpriseViewSetMixin(PermissionRequiredMixin):
@@ -77,7 +71,7 @@ class EnterpriseLearnerEnrollmentViewSet(EnterpriseViewSetMixin, viewsets.ReadOn
     pagination_class = EnterpriseEnrollmentsPagination
     filter_backends = (AuditEnrollmentsFilterBackend, filters.OrderingFilter,)
     ordering_fields = '__all__'
-    ordering = ('-last_activity_date',)
+    ordering = ('-last_activity_date', '-enterprise_enrollment_id',)
     ENROLLMENT_MODE_FILTER = 'user_current_enrollment_mode'
     COUPON_CODE_FILTER = 'coupon_code'
     OFFER_FILTER = 'offer_type'
@@ -106,6 +100,31 @@ class EnterpriseLearnerEnrollmentViewSet(EnterpriseViewSetMixin, viewsets.ReadOn
         renderer_context['header'] = self.header
         return renderer_context
 
+    def list(self, request, *args, **kwargs):
+        """
+        List view for learner enrollments of a given enterprise.
+
+        Unpaginated CSV exports are streamed row by row instead of being rendered from a fully evaluated queryset.
+        """
+        if 'no_page' in request.query_params and request.accepted_renderer.format == 'csv':
+            return self.stream_csv(self.filter_queryset(self.get_queryset()))
+        return super().list(request, *args, **kwargs)
+
+    def stream_csv(self, queryset):
+        """
+        Returns a streaming CSV response for the enrollments in `queryset`, with `header` as the first row.
+        """
+        serializer = self.get_serializer()
+        writer = csv.writer(Echo())
+
+        def rows():
+            yield writer.writerow(self.header)
+            for enrollment in queryset.iterator(chunk_size=CSV_EXPORT_CHUNK_SIZE):
+                data = serializer.to_representation(enrollment)
+                yield writer.writerow([data[field] for field in self.header])
+
+        return StreamingHttpResponse(rows(), content_type='text/csv; charset=utf-8')
+
     def get_queryset(self):
         """
         Returns all learner enrollment records for a given enterprise.
@@ -116,29 +135,34 @@ class EnterpriseLearnerEnrollmentViewSet(EnterpriseViewSetMixin, viewsets.ReadOn
             return EnterpriseLearnerEnrollment.objects.none()
 
         enterprise_customer_uuid = self.kwargs['enterprise_id']
+        if not self.enterprise_has_learners(enterprise_customer_uuid):
+            LOGGER.warning(
+                "[Data Overview Failure] Wrong Enterprise UUID. UUID [%s], Endpoint ['%s'], User: [%s]",
+                enterprise_customer_uuid,
+                self.request.get_full_path(),
+                self.request.user.username,
+            )
+
+        enrollments = EnterpriseLearnerEnrollment.objects.filter(enterprise_customer_uuid=enterprise_customer_uuid)
+
+        enrollments = self.apply_filters(enrollments)
+        return enrollments
+
+    def enterprise_has_learners(self, enterprise_customer_uuid):
+        """
+        Returns whether any learner exists for the given enterprise, the result is cached as it rarely changes.
+        """
         cache_key = get_cache_key(
-            resource='enterprise-learner',
+            resource='enterprise-learner-exists',
             enterprise_customer=enterprise_customer_uuid,
         )
         cached_response = TieredCache.get_cached_response(cache_key)
         if cached_response.is_found:
             return cached_response.value
-        else:
-            enterprise = EnterpriseLearner.objects.filter(enterprise_customer_uuid=enterprise_customer_uuid).exists()
-
-            if not enterprise:
-                LOGGER.warning(
-                    "[Data Overview Failure] Wrong Enterprise UUID. UUID [%s], Endpoint ['%s'], User: [%s]",
-                    enterprise_customer_uuid,
-                    self.request.get_full_path(),
-                    self.request.user.username,
-                )
-
-            enrollments = EnterpriseLearnerEnrollment.objects.filter(enterprise_customer_uuid=enterprise_customer_uuid)
 
-            enrollments = self.apply_filters(enrollments)
-            TieredCache.set_all_tiers(cache_key, enrollments, DEFAULT_LEARNER_CACHE_TIMEOUT)
-            return enrollments
+        has_learners = EnterpriseLearner.objects.filter(enterprise_customer_uuid=enterprise_customer_uuid).exists()
+        TieredCache.set_all_tiers(cache_key, has_learners, DEFAULT_LEARNER_CACHE_TIMEOUT)
+        return has_learners
 
     def apply_filters(self, queryset):
         """
@@ -146,7 +170,7 @@ class EnterpriseLearnerEnrollmentViewSet(EnterpriseViewSetMixin, viewsets.ReadOn
         """
         query_filters = self.request.query_params
 
-        past_week_date = date.today() - timedelta(weeks=1)
+        past_week_date = subtract_one_week(date.today())
         past_month_date = subtract_one_month(date.today())
 
         passed_date_param = query_filters.get('passed_date')
@@ -155,13 +179,18 @@ class EnterpriseLearnerEnrollmentViewSet(EnterpriseViewSetMixin, viewsets.ReadOn
 
         learner_activity_param = query_filters.get('learner_activity')
         if learner_activity_param:
-            queryset = self.filter_active_enrollments(queryset)
-        if learner_activity_param == 'active_past_week':
-            queryset = self.filter_active_learners(queryset, past_week_date)
-        elif learner_activity_param == 'inactive_past_week':
-            queryset = self.filter_inactive_learners(queryset, past_week_date)
-        elif learner_activity_param == 'inactive_past_month':
-            queryset = self.filter_inactive_learners(queryset, past_month_date)
+            # Only enrollments in courses that are still running and not passed yet count towards learner activity.
+            activity_filters = {
+                'has_passed': False,
+                'course_end_date__gte': timezone.now(),
+            }
+            if learner_activity_param == 'active_past_week':
+                activity_filters['last_activity_date__gte'] = past_week_date
+            elif learner_activity_param == 'inactive_past_week':
+                activity_filters['last_activity_date__lte'] = past_week_date
+            elif learner_activity_param == 'inactive_past_month':
+                activity_filters['last_activity_date__lte'] = past_month_date
+            queryset = queryset.filter(**activity_filters)
 
         search_email = query_filters.get('search')
         if search_email:
@@ -212,66 +241,37 @@ class EnterpriseLearnerEnrollmentViewSet(EnterpriseViewSetMixin, viewsets.ReadOn
         # but api clients are sending uuids with hyphen and that causes the issue
         # we need to remove the hyphens from uuid, convert the uuid to lower case and then do a compare in DB
 
-        # if offer_id is a uuid only then do the transformation
-        try:
-            offer_id_uuid_obj = UUID(offer_id, version=4)
-            offer_id = str(offer_id_uuid_obj)
-            offer_id = offer_id.replace('-', '')
-        except ValueError:
-            pass
+        # if offer_id is a uuid only then do the transformation, integer offer ids are never 32 or 36 characters long
+        # so they are passed through without any parsing.
+        offer_id_hex = offer_id.replace('-', '') if len(offer_id) == 36 and offer_id.count('-') == 4 else offer_id
+        if len(offer_id_hex) == 32 and HEX_REGEX.fullmatch(offer_id_hex):
+            offer_id = offer_id_hex.lower()
 
         return queryset.filter(offer_id=offer_id)
 
-    def filter_active_enrollments(self, queryset):
+    def filter_past_week_completions(self, queryset):
         """
-        Filters queryset to include enrollments with course date in future
-        and learners have not passed the course yet.
+        Filters only those learners who completed a course in last week.
         """
+        # `passed_date` is a DateField, compare it against dates so the range compiles to a single
+        # BETWEEN on the `elle_cust_passed_idx` index columns.
+        date_today = date.today()
+        date_week_before = subtract_one_week(date_today)
         return queryset.filter(
-            has_passed=False,
-            course_end_date__gte=timezone.now(),
+            has_passed=True,
+            passed_date__range=(date_week_before, date_today),
         )
 
-    def filter_distinct_learners(self, queryset):
-        """
-        Filters queryset to include enrollments with a distinct `enterprise_user_id`.
-        """
-        return queryset.values_list('enterprise_user_id', flat=True).distinct()
-
-    def filter_active_learners(self, queryset, last_activity_date):
-        """
-        Filters queryset to include enrollments more recent than the specified `last_activity_date`.
-        """
-        return queryset.filter(last_activity_date__gte=last_activity_date)
-
-    def filter_inactive_learners(self, queryset, last_activity_date):
-        """
-        Filters queryset to include enrollments more older than the specified `last_activity_date`.
-        """
-        return queryset.filter(last_activity_date__lte=last_activity_date)
-
-    def filter_distinct_active_learners(self, queryset, last_activity_date):
-        """
-        Filters queryset to include distinct enrollments more recent than the specified `last_activity_date`.
-        """
-        return self.filter_distinct_learners(self.filter_active_learners(queryset, last_activity_date))
-
-    def filter_course_completions(self, queryset):
+    def was_active_since(self, last_activity_date):
         """
-        Filters queryset to include only enrollments that are passing (i.e., completion).
+        Returns an aggregate that is 1 for a learner with any enrollment active since `last_activity_date`, else 0.
         """
-        return queryset.filter(has_passed=1)
-
-    def filter_past_week_completions(self, queryset):
-        """
-        Filters only those learners who completed a course in last week.
-        """
-        date_today = timezone.now()
-        date_week_before = date_today - timedelta(weeks=1)
-        return queryset.filter(
-            has_passed=True,
-            passed_date__lte=date_today,
-            passed_date__gte=date_week_before,
+        return Max(
+            Case(
+                When(enterprise_user_id__isnull=False, last_activity_date__gte=last_activity_date, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
         )
 
     def filter_number_of_users(self):
@@ -280,13 +280,6 @@ class EnterpriseLearnerEnrollmentViewSet(EnterpriseViewSetMixin, viewsets.ReadOn
         """
         return EnterpriseLearner.objects.filter(enterprise_customer_uuid=self.kwargs['enterprise_id'])
 
-    def get_max_created_date(self, queryset):
-        """
-        Gets the maximum created timestamp from the queryset.
-        """
-        created_max = queryset.aggregate(Max('created'))
-        return created_max['created__max']
-
     @action(detail=False)
     def overview(self, request, **kwargs):
         """
@@ -296,26 +289,48 @@ class EnterpriseLearnerEnrollmentViewSet(EnterpriseViewSetMixin, viewsets.ReadOn
             - # of course completions.
             - # of enterprise users (LMS)
         """
+        cache_key = get_cache_key(
+            resource='enterprise-overview',
+            enterprise_customer=kwargs['enterprise_id'],
+            query_params=urlencode(sorted(request.query_params.lists()), doseq=True),
+        )
+        cached_response = TieredCache.get_cached_response(cache_key)
+        if cached_response.is_found:
+            return Response(cached_response.value)
+
         enrollments = self.get_queryset()
-        enrollments = self.filter_queryset(enrollments)
-        course_completions = self.filter_course_completions(enrollments)
-        distinct_learners = self.filter_distinct_learners(enrollments)
-        past_week_date = date.today() - timedelta(weeks=1)
+        # Ordering applied by the `OrderingFilter` backend is of no use for aggregation, clear it so that the
+        # ordering fields are not sorted on or added to the `GROUP BY` clause below.
+        enrollments = self.filter_queryset(enrollments).order_by()
+        past_week_date = subtract_one_week(date.today())
         past_month_date = subtract_one_month(date.today())
-        active_learners_week = self.filter_distinct_active_learners(enrollments, past_week_date)
-        last_updated_date = self.get_max_created_date(enrollments)
-        active_learners_month = self.filter_distinct_active_learners(enrollments, past_month_date)
+        # Group enrollments by learner and aggregate over the grouped rows, this lets the database count
+        # distinct learners without a `COUNT(DISTINCT ...)` sort and still produces every figure in one query.
+        learners = enrollments.values('enterprise_user_id').annotate(
+            learner_active_past_week=self.was_active_since(past_week_date),
+            learner_active_past_month=self.was_active_since(past_month_date),
+            learner_course_completions=Count('pk', filter=Q(has_passed=True)),
+            learner_last_updated_date=Max('created'),
+        )
+        overview = learners.aggregate(
+            enrolled_learners=Count('enterprise_user_id'),
+            active_past_week=Sum('learner_active_past_week'),
+            active_past_month=Sum('learner_active_past_month'),
+            course_completions=Sum('learner_course_completions'),
+            last_updated_date=Max('learner_last_updated_date'),
+        )
         enterprise_users = self.filter_number_of_users()
         content = {
-            'enrolled_learners': distinct_learners.count(),
+            'enrolled_learners': overview['enrolled_learners'],
             'active_learners': {
-                'past_week': active_learners_week.count(),
-                'past_month': active_learners_month.count(),
+                'past_week': overview['active_past_week'] or 0,
+                'past_month': overview['active_past_month'] or 0,
             },
-            'course_completions': course_completions.count(),
-            'last_updated_date': last_updated_date,
+            'course_completions': overview['course_completions'] or 0,
+            'last_updated_date': overview['last_updated_date'],
             'number_of_users': enterprise_users.count(),
         }
+        TieredCache.set_all_tiers(cache_key, content, DEFAULT_LEARNER_CACHE_TIMEOUT)
         return Response(content)
 
 
@@ -362,38 +377,30 @@ class EnterpriseLearnerViewSet(EnterpriseViewSetMixin, viewsets.ReadOnlyModelVie
 
     def get_queryset(self):
         LOGGER.info("[ELV_ANALYTICS_API_V1] QueryParams: [%s]", self.request.query_params)
-        queryset = super().get_queryset().prefetch_related(
-            Prefetch(
-                'enrollments',
-                queryset=EnterpriseLearnerEnrollment.objects.filter(
-                    enterprise_customer_uuid=self.kwargs['enterprise_id']
-                )
-            ),
-        )
+        queryset = super().get_queryset()
+        enrollments = EnterpriseLearnerEnrollment.objects.filter(enterprise_user=OuterRef('enterprise_user_id'))
 
         has_enrollments = self.request.query_params.get('has_enrollments')
         if has_enrollments == 'true':
-            queryset = queryset.filter(enrollments__isnull=False).distinct()
+            queryset = queryset.filter(Exists(enrollments))
         elif has_enrollments == 'false':
-            queryset = queryset.filter(enrollments__isnull=True)
+            queryset = queryset.filter(~Exists(enrollments))
 
         active_courses = self.request.query_params.get('active_courses')
         if active_courses == 'true':
             queryset = queryset.filter(
-                Q(enrollments__is_consent_granted=True),
-                enrollments__course_end_date__gte=timezone.now()
+                Exists(enrollments.filter(is_consent_granted=True, course_end_date__gte=timezone.now()))
             )
         elif active_courses == 'false':
             queryset = queryset.filter(
-                Q(enrollments__is_consent_granted=True),
-                enrollments__course_end_date__lte=timezone.now()
+                Exists(enrollments.filter(is_consent_granted=True, course_end_date__lte=timezone.now()))
             )
 
         all_enrollments_passed = self.request.query_params.get('all_enrollments_passed')
         if all_enrollments_passed == 'true':
-            queryset = queryset.filter(enrollments__has_passed=True)
+            queryset = queryset.filter(Exists(enrollments.filter(has_passed=True)))
         elif all_enrollments_passed == 'false':
-            queryset = queryset.filter(enrollments__has_passed=False)
+            queryset = queryset.filter(Exists(enrollments.filter(has_passed=False)))
 
         extra_fields = self.request.query_params.getlist('extra_fields')
         if 'enrollment_count' in extra_fields:
@@ -403,7 +410,7 @@ class EnterpriseLearnerViewSet(EnterpriseViewSetMixin, viewsets.ReadOnlyModelVie
                     is_consent_granted=True,
                 )
                 .values('enterprise_user')
-                .annotate(enrollment_count=Count('pk', distinct=True))
+                .annotate(enrollment_count=Count('pk'))
                 .values('enrollment_count')
             )
             queryset = queryset.annotate(
@@ -422,7 +429,7 @@ class EnterpriseLearnerViewSet(EnterpriseViewSetMixin, viewsets.ReadOnlyModelVie
                     is_consent_granted=True,
                 )
                 .values('enterprise_user')
-                .annotate(course_completion_count=Count('pk', distinct=True))
+                .annotate(course_completion_count=Count('pk'))
                 .values('course_completion_count')
             )
             # Coalesce and Value used here so we don't return "null" to the
@@ -473,12 +480,14 @@ class EnterpriseLearnerCompletedCoursesViewSet(EnterpriseViewSetMixin, viewsets.
             # See: https://github.com/axnsan12/drf-yasg/issues/333
             return EnterpriseLearnerEnrollment.objects.none()
 
-        # Get the number of completed courses against a learner.
+        # Get the number of completed courses against a learner. `courserun_key` is non-null, so counting rows
+        # gives the same result as counting `courserun_key` values, and lets the query be answered from the
+        # `elle_completed_idx` index alone.
         enrollments = EnterpriseLearnerEnrollment.objects.filter(
             enterprise_customer_uuid=self.kwargs['enterprise_id'],
             has_passed=True,
             is_consent_granted=True,  # DSC check required
-        ).values('user_email').annotate(completed_courses=Count('courserun_key')).order_by('user_email')
+        ).values('user_email').annotate(completed_courses=Count('pk')).order_by('user_email')
         return enrollments
 
 
@@ -495,25 +504,23 @@ class EnterpriseAdminInsightsView(APIView):
         HTTP GET endpoint to retrieve the enterprise admin insights
         """
         response_data = {}
-        learner_progress = {}
-        learner_engagement = {}
-
-        try:
-            learner_progress = EnterpriseAdminLearnerProgress.objects.get(enterprise_customer_uuid=enterprise_id)
-            learner_progress = serializers.EnterpriseAdminLearnerProgressSerializer(learner_progress).data
-            response_data['learner_progress'] = learner_progress
-        except EnterpriseAdminLearnerProgress.DoesNotExist:
-            pass
-
-        try:
-            learner_engagement = EnterpriseAdminSummarizeInsights.objects.get(enterprise_customer_uuid=enterprise_id)
-            learner_engagement = serializers.EnterpriseAdminSummarizeInsightsSerializer(learner_engagement).data
-            response_data['learner_engagement'] = learner_engagement
-        except EnterpriseAdminSummarizeInsights.DoesNotExist:
-            pass
-
-        status = HTTP_200_OK
-        if learner_progress == {} and learner_engagement == {}:
-            status = HTTP_404_NOT_FOUND
+
+        learner_progress = EnterpriseAdminLearnerProgress.objects.filter(
+            enterprise_customer_uuid=enterprise_id
+        ).first()
+        if learner_progress:
+            response_data['learner_progress'] = serializers.EnterpriseAdminLearnerProgressSerializer(
+                learner_progress
+            ).data
+
+        learner_engagement = EnterpriseAdminSummarizeInsights.objects.filter(
+            enterprise_customer_uuid=enterprise_id
+        ).first()
+        if learner_engagement:
+            response_data['learner_engagement'] = serializers.EnterpriseAdminSummarizeInsightsSerializer(
+                learner_engagement
+            ).data
+
+        status = HTTP_200_OK if response_data else HTTP_404_NOT_FOUND
 
         return Response(data=response_data, status=status)
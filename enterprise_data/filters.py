@@ -7,7 +7,7 @@ from logging import getLogger
 from rest_framework import filters
 
 from django.conf import settings
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 
 from enterprise_data.clients import EnterpriseApiClient
 from enterprise_data.constants import ANALYTICS_API_VERSION_0, ANALYTICS_API_VERSION_1, ANALYTICS_API_VERSION_ATTR
@@ -117,21 +117,16 @@ class AuditUsersEnrollmentFilterBackend(filters.BaseFilterBackend, FiltersMixin)
             )
         elif version == ANALYTICS_API_VERSION_1:
             if not enable_audit_data_reporting:
-                audit_enrollments_enterprise_user_ids = EnterpriseLearnerEnrollment.objects.filter(
-                    enterprise_customer_uuid=enterprise_uuid,
-                    enterprise_user_id__isnull=False,
-                    user_current_enrollment_mode="audit",
-                ).values_list(
-                    'enterprise_user_id',
-                    flat=True
-                )
-                audit_enrollments_enterprise_user_ids = list(audit_enrollments_enterprise_user_ids)
                 LOGGER.info(
-                    "[ELV_ANALYTICS_API_V1] Enterprise: [%s], AuditDataReporting: [%s], AuditEnrollments: [%s]",
+                    "[ELV_ANALYTICS_API_V1] Enterprise: [%s], AuditDataReporting: [%s], excluding audit enrollments",
                     enterprise_uuid,
                     enable_audit_data_reporting,
-                    len(audit_enrollments_enterprise_user_ids)
                 )
-                queryset = queryset.exclude(enterprise_user_id__in=audit_enrollments_enterprise_user_ids)
+                audit_enrollments = EnterpriseLearnerEnrollment.objects.filter(
+                    enterprise_customer_uuid=enterprise_uuid,
+                    enterprise_user_id=OuterRef('enterprise_user_id'),
+                    user_current_enrollment_mode="audit",
+                )
+                queryset = queryset.filter(~Exists(audit_enrollments))
 
         return queryset
@@ -0,0 +1,73 @@
+"""
+Middleware for enterprise data app.
+"""
+
+import random
+from logging import getLogger
+
+from django.conf import settings
+from django.db import connections
+
+LOGGER = getLogger(__name__)
+DEFAULT_QUERY_COUNT_SAMPLE_RATE = 0.0
+DEFAULT_QUERY_COUNT_THRESHOLD = 20
+
+
+class QueryCounter:
+    """
+    Database execute wrapper that counts the queries run through it.
+    """
+
+    def __init__(self):
+        """
+        Initialize the counter with no queries counted.
+        """
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """
+        Count the query and run it.
+        """
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryCountLoggingMiddleware:
+    """
+    Logs requests that run more queries against the `enterprise_reporting` database than a threshold.
+
+    Only a sample of the requests is inspected, configured through the following settings:
+        ENTERPRISE_DATA_QUERY_COUNT_SAMPLE_RATE: Fraction of requests to inspect, between 0 and 1 (default 0).
+        ENTERPRISE_DATA_QUERY_COUNT_THRESHOLD: Number of queries above which a request is logged (default 20).
+
+    Queries are counted with a database execute wrapper, so this works without `DEBUG` enabled. Queries run
+    while a streaming response is consumed happen after the middleware returns and are not counted.
+    """
+
+    def __init__(self, get_response):
+        """
+        Initialize the middleware with the next handler in the chain.
+        """
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """
+        Count the queries run by a sampled request and log it if they exceed the threshold.
+        """
+        sample_rate = getattr(settings, 'ENTERPRISE_DATA_QUERY_COUNT_SAMPLE_RATE', DEFAULT_QUERY_COUNT_SAMPLE_RATE)
+        if random.random() >= sample_rate:
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        with connections[settings.ENTERPRISE_REPORTING_DB_ALIAS].execute_wrapper(counter):
+            response = self.get_response(request)
+
+        threshold = getattr(settings, 'ENTERPRISE_DATA_QUERY_COUNT_THRESHOLD', DEFAULT_QUERY_COUNT_THRESHOLD)
+        if counter.count > threshold:
+            LOGGER.warning(
+                "[Enterprise Data Query Count] Path: [%s], Queries: [%s], Threshold: [%s]",
+                request.path,
+                counter.count,
+                threshold,
+            )
+        return response
@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enterprise_data', '0038_enterpriseoffer_export_timestamp'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enterpriselearnerenrollment',
+            index=models.Index(
+                fields=['enterprise_customer_uuid', '-last_activity_date', '-enterprise_enrollment_id'],
+                name='elle_cust_activity_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enterprise_data', '0039_enterpriselearnerenrollment_elle_cust_activity_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enterpriselearnerenrollment',
+            index=models.Index(
+                fields=['enterprise_customer_uuid', 'has_passed', 'passed_date'],
+                name='elle_cust_passed_idx',
+            ),
+        ),
+    ]
@@ -70,6 +70,24 @@ class EnterpriseLearnerEnrollment(models.Model):
         db_table = 'enterprise_learner_enrollment'
         verbose_name = _("Enterprise Learner Enrollment")
         verbose_name_plural = _("Enterprise Learner Enrollments")
+        indexes = [
+            # Matches the default ordering of the enrollments API for a single enterprise, and also serves
+            # the `last_activity_date` range filters of the learner activity filters and overview.
+            models.Index(
+                fields=['enterprise_customer_uuid', '-last_activity_date', '-enterprise_enrollment_id'],
+                name='elle_cust_activity_idx',
+            ),
+            # Used by the completion filters and counts of the enrollments API.
+            models.Index(
+                fields=['enterprise_customer_uuid', 'has_passed', 'passed_date'],
+                name='elle_cust_passed_idx',
+            ),
+            # Covers the filter and the `user_email` grouping of the learner completed courses API.
+            models.Index(
+                fields=['enterprise_customer_uuid', 'has_passed', 'is_consent_granted', 'user_email'],
+                name='elle_completed_idx',
+            ),
+        ]
 
     enterprise_enrollment_id = models.PositiveIntegerField(primary_key=True)
     enrollment_id = models.PositiveIntegerField(null=True)
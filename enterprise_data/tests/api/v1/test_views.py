@@ -2,19 +2,26 @@
 Tests for views in the `enterprise_data` module.
 """
 
+import csv
 import datetime
+import io
 import os
 from unittest import mock
 from uuid import UUID, uuid4
 
 import ddt
+from edx_django_utils.cache import TieredCache
 from pytest import mark
-from rest_framework import status
+from rest_framework import renderers, status
 from rest_framework.reverse import reverse
 from rest_framework.test import APITransactionTestCase
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from enterprise_data.api.v1.serializers import EnterpriseOfferSerializer
-from enterprise_data.models import EnterpriseLearnerEnrollment, EnterpriseOffer
+from enterprise_data.api.v1.views import EnterpriseLearnerEnrollmentViewSet
+from enterprise_data.models import EnterpriseLearner, EnterpriseLearnerEnrollment, EnterpriseOffer
 from enterprise_data.tests.factories import (
     EnterpriseAdminLearnerProgressFactory,
     EnterpriseAdminSummarizeInsightsFactory,
@@ -61,6 +68,7 @@ class TestEnterpriseLearnerEnrollmentViewSet(JWTTestMixin, APITransactionTestCas
     def tearDown(self):
         super().tearDown()
         EnterpriseLearnerEnrollment.objects.all().delete()
+        TieredCache.dangerous_clear_all_tiers()
 
     def test_filter_by_offer_id(self):
         enterprise_learner = EnterpriseLearnerFactory(
@@ -89,6 +97,34 @@ class TestEnterpriseLearnerEnrollmentViewSet(JWTTestMixin, APITransactionTestCas
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]['enrollment_id'], learner_enrollment_1.enrollment_id)
 
+    @ddt.data(str.lower, str.upper)
+    def test_filter_by_uuid_offer_id(self, transform):
+        """Test that uuid offer ids sent with hyphens match the hyphen-less lower case value stored in the table"""
+        enterprise_learner = EnterpriseLearnerFactory(
+            enterprise_customer_uuid=self.enterprise_id
+        )
+        offer_id = str(uuid4())
+
+        learner_enrollment = EnterpriseLearnerEnrollmentFactory(
+            offer_id=offer_id.replace('-', ''),
+            enterprise_customer_uuid=self.enterprise_id,
+            is_consent_granted=True,
+            enterprise_user_id=enterprise_learner.enterprise_user_id
+        )
+        EnterpriseLearnerEnrollmentFactory(
+            offer_id='1234',
+            enterprise_customer_uuid=self.enterprise_id,
+            is_consent_granted=True,
+            enterprise_user_id=enterprise_learner.enterprise_user_id
+        )
+
+        url = reverse('v1:enterprise-learner-enrollment-list', kwargs={'enterprise_id': self.enterprise_id})
+        for requested_offer_id in (offer_id, offer_id.replace('-', '')):
+            response = self.client.get(url, data={'offer_id': transform(requested_offer_id)})
+            results = response.json()['results']
+            self.assertEqual(len(results), 1)
+            self.assertEqual(results[0]['enrollment_id'], learner_enrollment.enrollment_id)
+
     def test_filter_by_ignore_null_course_list_price(self):
         enterprise_learner = EnterpriseLearnerFactory(
             enterprise_customer_uuid=self.enterprise_id
@@ -198,6 +234,229 @@ class TestEnterpriseLearnerEnrollmentViewSet(JWTTestMixin, APITransactionTestCas
         results = response.json()['results']
         self.assertEqual(len(results), 1)
 
+    def test_filter_by_passed_date_last_week(self):
+        """Test that the last week completion filter includes both ends of the week"""
+        today = datetime.date.today()
+        enterprise_learner = EnterpriseLearnerFactory(enterprise_customer_uuid=self.enterprise_id)
+        expected_enrollment_ids = []
+        for has_passed, passed_date in (
+            (True, today),
+            (True, today - datetime.timedelta(weeks=1)),
+            (True, today - datetime.timedelta(days=8)),
+            (False, today),
+        ):
+            enrollment = EnterpriseLearnerEnrollmentFactory(
+                enterprise_customer_uuid=self.enterprise_id,
+                is_consent_granted=True,
+                enterprise_user_id=enterprise_learner.enterprise_user_id,
+                has_passed=has_passed,
+                passed_date=passed_date,
+            )
+            if has_passed and passed_date >= today - datetime.timedelta(weeks=1):
+                expected_enrollment_ids.append(enrollment.enterprise_enrollment_id)
+
+        url = reverse('v1:enterprise-learner-enrollment-list', kwargs={'enterprise_id': self.enterprise_id})
+        response = self.client.get(url, data={'passed_date': 'last_week'})
+        self.assertEqual(
+            sorted(result['enterprise_enrollment_id'] for result in response.json()['results']),
+            sorted(expected_enrollment_ids),
+        )
+
+    @ddt.data(
+        ('active_past_week', ['today']),
+        ('inactive_past_week', ['two_weeks_ago', 'two_months_ago']),
+        ('inactive_past_month', ['two_months_ago']),
+    )
+    @ddt.unpack
+    def test_filter_by_learner_activity(self, learner_activity, expected_enrollments):
+        """Test that the learner activity filter only returns matching enrollments in running courses"""
+        today = datetime.date.today()
+        enterprise_learner = EnterpriseLearnerFactory(enterprise_customer_uuid=self.enterprise_id)
+        enrollments = {}
+        for name, last_activity_date in (
+            ('today', today),
+            ('two_weeks_ago', today - datetime.timedelta(weeks=2)),
+            ('two_months_ago', today - datetime.timedelta(weeks=9)),
+        ):
+            enrollments[name] = EnterpriseLearnerEnrollmentFactory(
+                enterprise_customer_uuid=self.enterprise_id,
+                is_consent_granted=True,
+                enterprise_user_id=enterprise_learner.enterprise_user_id,
+                has_passed=False,
+                course_start_date=today - datetime.timedelta(weeks=10),
+                course_end_date=today + datetime.timedelta(weeks=1),
+                last_activity_date=last_activity_date,
+            )
+        # passed enrollments and enrollments in courses that have ended are never included
+        EnterpriseLearnerEnrollmentFactory(
+            enterprise_customer_uuid=self.enterprise_id,
+            is_consent_granted=True,
+            enterprise_user_id=enterprise_learner.enterprise_user_id,
+            has_passed=True,
+            course_start_date=today - datetime.timedelta(weeks=10),
+            course_end_date=today + datetime.timedelta(weeks=1),
+            last_activity_date=today,
+        )
+        EnterpriseLearnerEnrollmentFactory(
+            enterprise_customer_uuid=self.enterprise_id,
+            is_consent_granted=True,
+            enterprise_user_id=enterprise_learner.enterprise_user_id,
+            has_passed=False,
+            course_start_date=today - datetime.timedelta(weeks=10),
+            course_end_date=today - datetime.timedelta(days=1),
+            last_activity_date=today - datetime.timedelta(weeks=9),
+        )
+
+        url = reverse('v1:enterprise-learner-enrollment-list', kwargs={'enterprise_id': self.enterprise_id})
+        response = self.client.get(url, data={'learner_activity': learner_activity})
+        results = response.json()['results']
+        self.assertEqual(
+            sorted(result['enterprise_enrollment_id'] for result in results),
+            sorted(enrollments[name].enterprise_enrollment_id for name in expected_enrollments),
+        )
+
+    def test_overview(self):
+        """Test that the overview endpoint returns correct aggregated counts"""
+        today = datetime.date.today()
+        learner_1 = EnterpriseLearnerFactory(enterprise_customer_uuid=self.enterprise_id)
+        learner_2 = EnterpriseLearnerFactory(enterprise_customer_uuid=self.enterprise_id)
+        EnterpriseLearnerFactory(enterprise_customer_uuid=self.enterprise_id)
+        EnterpriseLearnerEnrollmentFactory(
+            enterprise_customer_uuid=self.enterprise_id,
+            is_consent_granted=True,
+            enterprise_user_id=learner_1.enterprise_user_id,
+            has_passed=True,
+            last_activity_date=today,
+        )
+        EnterpriseLearnerEnrollmentFactory(
+            enterprise_customer_uuid=self.enterprise_id,
+            is_consent_granted=True,
+            enterprise_user_id=learner_1.enterprise_user_id,
+            has_passed=False,
+            last_activity_date=today - datetime.timedelta(days=2),
+        )
+        EnterpriseLearnerEnrollmentFactory(
+            enterprise_customer_uuid=self.enterprise_id,
+            is_consent_granted=True,
+            enterprise_user_id=learner_2.enterprise_user_id,
+            has_passed=False,
+            last_activity_date=today - datetime.timedelta(weeks=2),
+        )
+
+        url = reverse('v1:enterprise-learner-enrollment-overview', kwargs={'enterprise_id': self.enterprise_id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = response.json()
+        self.assertEqual(content['enrolled_learners'], 2)
+        self.assertEqual(content['active_learners'], {'past_week': 1, 'past_month': 2})
+        self.assertEqual(content['course_completions'], 1)
+        self.assertEqual(content['number_of_users'], 3)
+
+    def test_overview_query_count_is_constant(self):
+        """Test that the number of queries run by the overview does not grow with the number of enrollments"""
+        url = reverse('v1:enterprise-learner-enrollment-overview', kwargs={'enterprise_id': self.enterprise_id})
+        # warm up any per process caches so that they do not skew the first measured request
+        self.client.get(url)
+        query_counts = []
+        for __ in range(2):
+            for __ in range(3):
+                enterprise_learner = EnterpriseLearnerFactory(enterprise_customer_uuid=self.enterprise_id)
+                EnterpriseLearnerEnrollmentFactory.create_batch(
+                    2,
+                    enterprise_customer_uuid=self.enterprise_id,
+                    is_consent_granted=True,
+                    enterprise_user_id=enterprise_learner.enterprise_user_id,
+                )
+            TieredCache.dangerous_clear_all_tiers()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            query_counts.append(len(queries))
+
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_overview_is_cached(self):
+        """Test that the overview response is served from cache for the same query params"""
+        enterprise_learner = EnterpriseLearnerFactory(enterprise_customer_uuid=self.enterprise_id)
+        EnterpriseLearnerEnrollmentFactory(
+            enterprise_customer_uuid=self.enterprise_id,
+            is_consent_granted=True,
+            enterprise_user_id=enterprise_learner.enterprise_user_id,
+        )
+
+        url = reverse('v1:enterprise-learner-enrollment-overview', kwargs={'enterprise_id': self.enterprise_id})
+        response = self.client.get(url)
+        self.assertEqual(response.json()['enrolled_learners'], 1)
+
+        another_learner = EnterpriseLearnerFactory(enterprise_customer_uuid=self.enterprise_id)
+        EnterpriseLearnerEnrollmentFactory(
+            enterprise_customer_uuid=self.enterprise_id,
+            is_consent_granted=True,
+            enterprise_user_id=another_learner.enterprise_user_id,
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.json()['enrolled_learners'], 1)
+
+        # a different set of query params must not be served the cached overview
+        response = self.client.get(url, data={'search': '@'})
+        self.assertEqual(response.json()['enrolled_learners'], 2)
+
+    def test_list_query_count_is_constant(self):
+        """Test that the number of queries run by the list endpoint does not grow with the page size"""
+        url = reverse('v1:enterprise-learner-enrollment-list', kwargs={'enterprise_id': self.enterprise_id})
+        enterprise_learner = EnterpriseLearnerFactory(enterprise_customer_uuid=self.enterprise_id)
+        # warm up any per process caches so that they do not skew the first measured request
+        self.client.get(url)
+        query_counts = []
+        for __ in range(2):
+            EnterpriseLearnerEnrollmentFactory.create_batch(
+                3,
+                enterprise_customer_uuid=self.enterprise_id,
+                is_consent_granted=True,
+                enterprise_user_id=enterprise_learner.enterprise_user_id,
+            )
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            query_counts.append(len(queries))
+
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_csv_export_is_streamed(self):
+        """Test that unpaginated CSV exports are streamed with the header as the first row"""
+        enterprise_learner = EnterpriseLearnerFactory(enterprise_customer_uuid=self.enterprise_id)
+        enrollments = [
+            EnterpriseLearnerEnrollmentFactory(
+                enterprise_customer_uuid=self.enterprise_id,
+                is_consent_granted=True,
+                enterprise_user_id=enterprise_learner.enterprise_user_id,
+            )
+            for __ in range(3)
+        ]
+
+        class CSVRenderer(renderers.BaseRenderer):  # pylint: disable=abstract-method
+            media_type = 'text/csv'
+            format = 'csv'
+
+        url = reverse('v1:enterprise-learner-enrollment-list', kwargs={'enterprise_id': self.enterprise_id})
+        with mock.patch.object(
+            EnterpriseLearnerEnrollmentViewSet,
+            'renderer_classes',
+            [renderers.JSONRenderer, CSVRenderer],
+        ):
+            response = self.client.get(url, data={'no_page': True, 'format': 'csv'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        content = b''.join(response.streaming_content).decode('utf-8')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(list(rows[0].keys()), EnterpriseLearnerEnrollmentViewSet.header)
+        self.assertEqual(
+            sorted(int(row['enterprise_enrollment_id']) for row in rows),
+            sorted(enrollment.enterprise_enrollment_id for enrollment in enrollments),
+        )
+
     def test_search_no_results(self):
         """Test that the search returns no results if no matches are found"""
         EnterpriseLearnerFactory(
@@ -211,6 +470,189 @@ class TestEnterpriseLearnerEnrollmentViewSet(JWTTestMixin, APITransactionTestCas
         self.assertEqual(response.json()['count'], 0)
 
 
+@ddt.ddt
+@mark.django_db
+class TestEnterpriseLearnerViewSet(JWTTestMixin, APITransactionTestCase):
+    """
+    Tests for EnterpriseLearnerViewSet.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory(is_staff=True)
+        role, __ = EnterpriseDataFeatureRole.objects.get_or_create(name=ENTERPRISE_DATA_ADMIN_ROLE)
+        self.role_assignment = EnterpriseDataRoleAssignment.objects.create(
+            role=role,
+            user=self.user
+        )
+        self.client.force_authenticate(user=self.user)
+
+        mocked_get_enterprise_customer = mock.patch(
+            'enterprise_data.filters.EnterpriseApiClient.get_enterprise_customer',
+            return_value=get_dummy_enterprise_api_data()
+        )
+
+        self.mocked_get_enterprise_customer = mocked_get_enterprise_customer.start()
+        self.addCleanup(mocked_get_enterprise_customer.stop)
+        self.enterprise_id = 'ee5e6b3a-069a-4947-bb8d-d2dbc323396c'
+        self.set_jwt_cookie()
+
+        today = datetime.date.today()
+        # learner with two passed enrollments in courses that have already ended
+        learner = EnterpriseLearnerFactory(enterprise_customer_uuid=self.enterprise_id)
+        for __ in range(2):
+            EnterpriseLearnerEnrollmentFactory(
+                enterprise_customer_uuid=self.enterprise_id,
+                is_consent_granted=True,
+                enterprise_user_id=learner.enterprise_user_id,
+                has_passed=True,
+                course_start_date=today - datetime.timedelta(days=60),
+                course_end_date=today - datetime.timedelta(days=1),
+            )
+        # learner with a single enrollment in a course that is still running
+        learner = EnterpriseLearnerFactory(enterprise_customer_uuid=self.enterprise_id)
+        EnterpriseLearnerEnrollmentFactory(
+            enterprise_customer_uuid=self.enterprise_id,
+            is_consent_granted=True,
+            enterprise_user_id=learner.enterprise_user_id,
+            has_passed=False,
+            course_start_date=today - datetime.timedelta(days=60),
+            course_end_date=today + datetime.timedelta(days=30),
+        )
+        # learner without any enrollment
+        EnterpriseLearnerFactory(enterprise_customer_uuid=self.enterprise_id)
+
+    def tearDown(self):
+        super().tearDown()
+        EnterpriseLearnerEnrollment.objects.all().delete()
+        EnterpriseLearner.objects.all().delete()
+
+    @ddt.data(
+        ({}, 3),
+        ({'has_enrollments': 'true'}, 2),
+        ({'has_enrollments': 'false'}, 1),
+        ({'active_courses': 'true'}, 1),
+        ({'active_courses': 'false'}, 1),
+        ({'all_enrollments_passed': 'true'}, 1),
+        ({'has_enrollments': 'true', 'active_courses': 'false', 'all_enrollments_passed': 'true'}, 1),
+        ({'has_enrollments': 'true', 'active_courses': 'false', 'all_enrollments_passed': 'false'}, 0),
+    )
+    @ddt.unpack
+    def test_list_filters(self, params, expected_count):
+        """
+        Verify that learners are filtered without duplicates for learners with multiple matching enrollments.
+        """
+        url = reverse('v1:enterprise-learner-list', kwargs={'enterprise_id': self.enterprise_id})
+        response = self.client.get(url, params)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['count'] == expected_count
+
+    def test_list_query_count_is_constant(self):
+        """
+        Verify that the number of queries run by the list endpoint does not grow with the number of learners.
+        """
+        url = reverse('v1:enterprise-learner-list', kwargs={'enterprise_id': self.enterprise_id})
+        params = {'has_enrollments': 'true', 'extra_fields': ['enrollment_count', 'course_completion_count']}
+        # warm up any per process caches so that they do not skew the first measured request
+        self.client.get(url, params)
+        query_counts = []
+        for __ in range(2):
+            for __ in range(3):
+                learner = EnterpriseLearnerFactory(enterprise_customer_uuid=self.enterprise_id)
+                EnterpriseLearnerEnrollmentFactory(
+                    enterprise_customer_uuid=self.enterprise_id,
+                    is_consent_granted=True,
+                    enterprise_user_id=learner.enterprise_user_id,
+                )
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+            assert response.status_code == status.HTTP_200_OK
+            query_counts.append(len(queries))
+
+        assert query_counts[0] == query_counts[1]
+
+    def test_list_enrollment_and_course_completion_counts(self):
+        """
+        Verify that `enrollment_count` and `course_completion_count` are returned for every learner.
+        """
+        url = reverse('v1:enterprise-learner-list', kwargs={'enterprise_id': self.enterprise_id})
+        response = self.client.get(
+            url,
+            {'extra_fields': ['enrollment_count', 'course_completion_count'], 'ordering': '-enrollment_count'},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        counts = [
+            (learner['enrollment_count'], learner['course_completion_count'])
+            for learner in response.json()['results']
+        ]
+        assert counts == [(2, 2), (1, 0), (0, 0)]
+
+
+@mark.django_db
+class TestEnterpriseLearnerCompletedCoursesViewSet(JWTTestMixin, APITransactionTestCase):
+    """
+    Tests for EnterpriseLearnerCompletedCoursesViewSet.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory(is_staff=True)
+        role, __ = EnterpriseDataFeatureRole.objects.get_or_create(name=ENTERPRISE_DATA_ADMIN_ROLE)
+        self.role_assignment = EnterpriseDataRoleAssignment.objects.create(
+            role=role,
+            user=self.user
+        )
+        self.client.force_authenticate(user=self.user)
+        self.enterprise_id = 'ee5e6b3a-069a-4947-bb8d-d2dbc323396c'
+        self.set_jwt_cookie()
+
+    def tearDown(self):
+        super().tearDown()
+        EnterpriseLearnerEnrollment.objects.all().delete()
+        EnterpriseLearner.objects.all().delete()
+
+    def test_list_completed_courses(self):
+        """
+        Verify that only passed and consented enrollments are counted for each learner.
+        """
+        learners = {
+            user_email: EnterpriseLearnerFactory(enterprise_customer_uuid=self.enterprise_id)
+            for user_email in ('learner1@example.com', 'learner2@example.com', 'learner3@example.com')
+        }
+        for user_email, has_passed, is_consent_granted in (
+            ('learner1@example.com', True, True),
+            ('learner1@example.com', True, True),
+            ('learner1@example.com', False, True),
+            ('learner2@example.com', True, True),
+            ('learner2@example.com', True, False),
+            ('learner3@example.com', False, True),
+        ):
+            EnterpriseLearnerEnrollmentFactory(
+                enterprise_customer_uuid=self.enterprise_id,
+                enterprise_user_id=learners[user_email].enterprise_user_id,
+                user_email=user_email,
+                has_passed=has_passed,
+                is_consent_granted=is_consent_granted,
+            )
+        other_enterprise_id = uuid4()
+        other_learner = EnterpriseLearnerFactory(enterprise_customer_uuid=other_enterprise_id)
+        EnterpriseLearnerEnrollmentFactory(
+            enterprise_customer_uuid=other_enterprise_id,
+            enterprise_user_id=other_learner.enterprise_user_id,
+            user_email='learner1@example.com',
+            has_passed=True,
+            is_consent_granted=True,
+        )
+
+        url = reverse('v1:enterprise-learner-completed-courses-list', kwargs={'enterprise_id': self.enterprise_id})
+        response = self.client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['results'] == [
+            {'user_email': 'learner1@example.com', 'completed_courses': 2},
+            {'user_email': 'learner2@example.com', 'completed_courses': 1},
+        ]
+
+
 @ddt.ddt
 @mark.django_db
 class TestEnterpriseOffersViewSet(JWTTestMixin, APITransactionTestCase):
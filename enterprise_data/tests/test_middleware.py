@@ -0,0 +1,59 @@
+"""
+Tests for middleware in the `enterprise_data` module.
+"""
+
+from unittest import mock
+
+import ddt
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from enterprise_data.middleware import QueryCountLoggingMiddleware
+from enterprise_data.models import EnterpriseLearner
+
+
+@ddt.ddt
+class TestQueryCountLoggingMiddleware(TestCase):
+    """
+    Tests for QueryCountLoggingMiddleware.
+    """
+
+    @staticmethod
+    def get_response(request):
+        """
+        Run two queries against the reporting database.
+        """
+        EnterpriseLearner.objects.exists()
+        EnterpriseLearner.objects.count()
+        return HttpResponse()
+
+    @ddt.data(
+        # sample rate, threshold, is logged
+        (1, 1, True),
+        (1, 2, False),
+        (0, 1, False),
+    )
+    @ddt.unpack
+    def test_query_count_logging(self, sample_rate, threshold, is_logged):
+        """
+        Verify that only sampled requests running more queries than the threshold are logged.
+        """
+        middleware = QueryCountLoggingMiddleware(self.get_response)
+        request = RequestFactory().get('/enterprise/api/v1/')
+        with override_settings(
+            ENTERPRISE_DATA_QUERY_COUNT_SAMPLE_RATE=sample_rate,
+            ENTERPRISE_DATA_QUERY_COUNT_THRESHOLD=threshold,
+        ):
+            with mock.patch('enterprise_data.middleware.LOGGER') as mock_logger:
+                response = middleware(request)
+
+        assert response.status_code == 200
+        assert mock_logger.warning.called == is_logged
+        if is_logged:
+            mock_logger.warning.assert_called_once_with(
+                "[Enterprise Data Query Count] Path: [%s], Queries: [%s], Threshold: [%s]",
+                '/enterprise/api/v1/',
+                2,
+                threshold,
+            )
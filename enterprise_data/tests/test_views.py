@@ -15,7 +15,6 @@ from rest_framework.test import APITransactionTestCase
 from django.utils import timezone
 
 from enterprise_data.api.v0.serializers import EnterpriseEnrollmentSerializer
-from enterprise_data.api.v0.views import subtract_one_month
 from enterprise_data.models import EnterpriseEnrollment, EnterpriseUser
 from enterprise_data.tests.mixins import JWTTestMixin
 from enterprise_data.tests.test_utils import (
@@ -24,6 +23,7 @@ from enterprise_data.tests.test_utils import (
     UserFactory,
     get_dummy_enterprise_api_data,
 )
+from enterprise_data.utils import subtract_one_month
 from enterprise_data_roles.constants import (
     ALL_ACCESS_CONTEXT,
     ENTERPRISE_DATA_ADMIN_ROLE,
@@ -3,7 +3,24 @@ Utility functions for Enterprise Data app.
 """
 
 
+import calendar
+import functools
 import hashlib
+from datetime import timedelta
+
+
+class Echo:
+    """
+    File-like object that returns the written value instead of buffering it.
+
+    Used with `csv.writer` to stream CSV rows one at a time.
+    """
+
+    def write(self, value):
+        """
+        Return the value instead of writing it to a buffer.
+        """
+        return value
 
 
 def get_cache_key(**kwargs):
@@ -28,3 +45,26 @@ def get_cache_key(**kwargs):
     key = '__'.join([f'{item}:{value}' for item, value in kwargs.items()])
 
     return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+
+@functools.lru_cache(maxsize=64)
+def subtract_one_month(original_date):
+    """
+    Return a date exactly one month prior to the passed in date.
+
+    If the previous month is shorter than the day of the passed in date, the last day of the previous month is returned.
+    """
+    if original_date.month > 1:
+        year, month = original_date.year, original_date.month - 1
+    else:
+        year, month = original_date.year - 1, 12
+    day = min(original_date.day, calendar.monthrange(year, month)[1])
+    return original_date.replace(year=year, month=month, day=day)
+
+
+@functools.lru_cache(maxsize=64)
+def subtract_one_week(original_date):
+    """
+    Return a date exactly one week prior to the passed in date.
+    """
+    return original_date - timedelta(weeks=1)